@@ -1,14 +1,48 @@
 import discord
 from discord.ext import commands, tasks
-import requests
 import asyncio
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
+import sys
+import time
 import json
-import aiohttp
+import aiohttp  # async only - all HTTP goes through the shared aiohttp session
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 from typing import Optional, Dict, List
 import sqlite3
 
+# Use orjson for decoding statuspage responses when available
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Use uvloop's faster event loop when available (not supported on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Logging - records are queued and written by a background thread so
+# slow stdout never blocks the event loop
+log_queue = queue.Queue(-1)
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('[{asctime}] [{levelname:<8}] {name}: {message}', '%Y-%m-%d %H:%M:%S', style='{'))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logger = logging.getLogger('serviceproviders')
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+logger.propagate = False
+
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
@@ -30,11 +64,66 @@ SERVICES = {
     "netlify": "https://www.netlifystatus.com/api/v2"
 }
 
+# Precomputed (status, incidents, components) endpoint URLs per service
+SERVICE_ENDPOINTS = {
+    service: (f"{url}/status.json", f"{url}/incidents.json", f"{url}/components.json")
+    for service, url in SERVICES.items()
+}
+
+# Max pooled connections per host on the shared aiohttp session; incident webhook
+# posts (all to discord.com) are capped at the same number so they never queue for a
+# connection long enough to hit the session timeout
+HTTP_LIMIT_PER_HOST = 8
+
+# Commands restricted to the bot owner (used for error messages)
+OWNER_COMMANDS = frozenset(("sendmessage", "sendembed", "broadcast", "botstats", "multisend", "spamchannel"))
+
+# Replies sent by the command error handler
+OWNER_ONLY_MSG = "❌ This command is restricted to the bot owner only."
+NO_PERM_MSG = "❌ You don't have permission to use this command."
+GENERIC_ERR_MSG = "❌ An error occurred while executing the command."
+
+# Max command error replies in flight at once
+ERROR_REPLY_CONCURRENCY = 32
+
+# Max guilds a broadcast sends to at the same time
+BROADCAST_CONCURRENCY = 20
+
+# How long fetched service data is reused (just under the 5 minute poll interval)
+SERVICE_CACHE_TTL = 240
+
+# SQL used by the bot - kept as constants so the text is identical on every call
+# and sqlite3's per-connection statement cache can reuse the compiled statement
+QUERIES = {
+    'select_enabled': 'SELECT guild_id, webhook_url, service, ping_role_id, last_incident_id FROM webhooks WHERE enabled = 1',
+    'update_last_incident': 'UPDATE webhooks SET last_incident_id = ? WHERE guild_id = ? AND service = ?',
+    'upsert_webhook': '''
+        INSERT OR REPLACE INTO webhooks 
+        (guild_id, channel_id, webhook_url, service, ping_role_id, enabled, last_incident_id)
+        VALUES (?, ?, ?, ?, ?, 1, NULL)
+    ''',
+    'delete_webhook': 'DELETE FROM webhooks WHERE guild_id = ? AND service = ?',
+    'list_guild_webhooks': 'SELECT service, channel_id, ping_role_id, enabled FROM webhooks WHERE guild_id = ?',
+    'select_enabled_flag': 'SELECT enabled FROM webhooks WHERE guild_id = ? AND service = ?',
+    'set_enabled': 'UPDATE webhooks SET enabled = ? WHERE guild_id = ? AND service = ?',
+    'count_enabled': 'SELECT COUNT(*) FROM webhooks WHERE enabled = 1',
+    'webhook_stats': 'SELECT COALESCE(SUM(enabled = 1), 0), COUNT(DISTINCT guild_id) FROM webhooks',
+}
+
 # Database setup - only store essential data
-def init_db():
+def init_db() -> sqlite3.Connection:
+    """Open the long-lived bot database connection and create tables"""
     conn = sqlite3.connect('bot_data.db')
     cursor = conn.cursor()
     
+    # WAL keeps readers from blocking on writes and turns commits into log appends.
+    # Note: WAL needs the directory holding bot_data.db to be writable (-wal/-shm files)
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA busy_timeout=5000')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA cache_size=-4000')
+    
     # Table for webhook configurations - minimal columns
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS webhooks (
@@ -46,11 +135,14 @@ def init_db():
             enabled INTEGER DEFAULT 1,
             last_incident_id TEXT,
             PRIMARY KEY (guild_id, service)
-        )
+        ) WITHOUT ROWID
     ''')
     
+    # Partial index so the polling loop only touches enabled rows
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_webhooks_enabled ON webhooks(enabled) WHERE enabled = 1')
+    
     conn.commit()
-    conn.close()
+    return conn
 
 class StatusBot(commands.Bot):
     def __init__(self):
@@ -59,24 +151,50 @@ class StatusBot(commands.Bot):
         super().__init__(command_prefix='!', intents=intents)
         
         self.session = None
-        init_db()
+        # All SQL runs on this one thread so blocking calls stay off the event loop.
+        # The connection is opened there too, so sqlite3's same-thread check rejects
+        # any use of it from another thread instead of letting it race
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bot-db')
+        self.db = None
+        self._active_webhook_count = 0
+        self.webhook_post_semaphore = None
+        self._error_reply_tasks = set()  # keeps background error replies referenced until done
+        self.error_reply_semaphore = None
+        self._svc_cache: Dict[str, tuple] = {}  # service -> (fetched_at, data)
+        self._target_channel_cache: Dict[int, int] = {}  # guild_id -> channel_id
         
     async def setup_hook(self):
-        self.session = aiohttp.ClientSession()
+        # Created here so it binds to the running event loop
+        self.webhook_post_semaphore = asyncio.Semaphore(HTTP_LIMIT_PER_HOST)
+        self.error_reply_semaphore = asyncio.Semaphore(ERROR_REPLY_CONCURRENCY)
+        
+        # Keep-alive connections and cached DNS are reused across polling cycles
+        connector = aiohttp.TCPConnector(limit=64, limit_per_host=HTTP_LIMIT_PER_HOST, ttl_dns_cache=300, keepalive_timeout=75)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=10))
+        # Open the database (schema + pragmas) on its thread rather than blocking at import
+        self.db = await self._run_db(init_db)
+        await self.refresh_active_webhook_count()
+        
         # Start the auto-posting task
         self.auto_post_status.start()
         
         # Sync commands
         try:
             synced = await self.tree.sync()
-            print(f"Synced {len(synced)} command(s)")
+            logger.info("Synced %d command(s)", len(synced))
         except Exception as e:
-            print(f"Failed to sync commands: {e}")
+            logger.error("Failed to sync commands: %s", e)
 
     async def close(self):
+        # Stop polling before tearing down what it uses
+        self.auto_post_status.cancel()
+        await super().close()
         if self.session:
             await self.session.close()
-        await super().close()
+        # Close the connection on its own thread, then stop that thread without blocking the loop
+        if self.db:
+            await self._run_db(self.db.close)
+        await asyncio.get_running_loop().run_in_executor(None, self._db_executor.shutdown)
 
     @tasks.loop(minutes=5)  # Check every 5 minutes
     async def auto_post_status(self):
@@ -86,27 +204,98 @@ class StatusBot(commands.Bot):
     async def before_auto_post(self):
         await self.wait_until_ready()
 
+    def get_target_channel(self, guild: discord.Guild) -> Optional[discord.TextChannel]:
+        """Find a channel we can send to in a guild (system channel, else first sendable text channel)"""
+        channel_id = self._target_channel_cache.get(guild.id)
+        if channel_id:
+            # Re-check permissions on a hit - the bot's own roles can change without an event we track
+            channel = guild.get_channel(channel_id)
+            if channel and channel.permissions_for(guild.me).send_messages:
+                return channel
+            self.invalidate_target_channel(guild.id)
+        
+        target_channel = None
+        
+        # Try system channel first
+        if guild.system_channel and guild.system_channel.permissions_for(guild.me).send_messages:
+            target_channel = guild.system_channel
+        else:
+            # Find first channel we can send messages to
+            for channel in guild.text_channels:
+                if channel.permissions_for(guild.me).send_messages:
+                    target_channel = channel
+                    break
+        
+        if target_channel:
+            self._target_channel_cache[guild.id] = target_channel.id
+        return target_channel
+
+    def invalidate_target_channel(self, guild_id: int):
+        """Forget the cached target channel for a guild"""
+        self._target_channel_cache.pop(guild_id, None)
+
+    async def refresh_active_webhook_count(self):
+        """Recount enabled webhooks so the polling loop can skip idle cycles"""
+        self._active_webhook_count = (await self.db_fetchone(QUERIES['count_enabled']))[0]
+
+    async def _run_db(self, func):
+        """Run a callable against the shared connection on the database thread"""
+        return await asyncio.get_running_loop().run_in_executor(self._db_executor, func)
+
+    async def db_fetchone(self, query: str, params: tuple = ()) -> Optional[tuple]:
+        """Run a read query on the database thread and return one row"""
+        return await self._run_db(lambda: self.db.execute(query, params).fetchone())
+
+    async def db_fetchall(self, query: str, params: tuple = ()) -> List[tuple]:
+        """Run a read query on the database thread and return all rows"""
+        return await self._run_db(lambda: self.db.execute(query, params).fetchall())
+
+    async def db_execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Run a write on the database thread in its own transaction"""
+        def write():
+            with self.db:
+                return self.db.execute(query, params)
+        return await self._run_db(write)
+
+    async def db_executemany(self, query: str, seq_of_params: List[tuple]) -> sqlite3.Cursor:
+        """Run a batched write on the database thread in a single transaction"""
+        def write():
+            with self.db:
+                return self.db.executemany(query, seq_of_params)
+        return await self._run_db(write)
+
+    async def _fetch_json(self, url: str) -> Dict:
+        """GET a URL on the shared session and decode the JSON body"""
+        async with self.session.get(url) as resp:
+            return await resp.json(loads=json_loads)
+
     async def get_service_data(self, service_name: str) -> Dict:
         """Fetch service status data"""
-        url = SERVICES.get(service_name)
-        if not url:
+        endpoints = SERVICE_ENDPOINTS.get(service_name)
+        if not endpoints:
             return None
+        
+        # Serve from cache while still fresh
+        cached = self._svc_cache.get(service_name)
+        if cached and time.monotonic() - cached[0] < SERVICE_CACHE_TTL:
+            return cached[1]
             
         try:
-            async with self.session.get(f"{url}/status.json") as resp:
-                status = await resp.json()
-            async with self.session.get(f"{url}/incidents.json") as resp:
-                incidents_data = await resp.json()
-            async with self.session.get(f"{url}/components.json") as resp:
-                components_data = await resp.json()
+            # Fetch all three endpoints concurrently
+            status, incidents_data, components_data = await asyncio.gather(
+                *(self._fetch_json(endpoint) for endpoint in endpoints)
+            )
                 
-            return {
+            data = {
                 'status': status,
                 'incidents': incidents_data.get('incidents', []),
-                'components': components_data.get('components', [])
+                'components': components_data.get('components', []),
+                'fetched_at': datetime.now(timezone.utc)
             }
+            self._svc_cache[service_name] = (time.monotonic(), data)
+            return data
         except Exception as e:
-            print(f"Error fetching {service_name} data: {e}")
+            logger.error("Error fetching %s data: %s", service_name, e)
             return None
 
     def create_status_embed(self, service_name: str, data: Dict) -> discord.Embed:
@@ -122,7 +311,7 @@ class StatusBot(commands.Bot):
             title=f"{service_name.capitalize()} Status",
             description=f"**Overall Status:** {description}",
             color=color,
-            timestamp=datetime.now(timezone.utc)  # UTC timezone aware
+            timestamp=data['fetched_at']  # When the data was fetched (may be served from cache)
         )
         
         # Add incidents
@@ -147,11 +336,12 @@ class StatusBot(commands.Bot):
         
         # Add component status
         components = data['components']
-        bad_components = [c for c in components if c.get('status') != 'operational']
+        # Stop scanning once 5 non-operational components are found
+        bad_components = list(islice((c for c in components if c.get('status') != 'operational'), 5))
         
         if bad_components:
             comp_text = ""
-            for comp in bad_components[:5]:  # Show max 5 components
+            for comp in bad_components:  # Show max 5 components
                 comp_text += f"• {comp['name']}: {comp['status']}\n"
             embed.add_field(name="Affected Components", value=comp_text, inline=False)
         else:
@@ -162,47 +352,81 @@ class StatusBot(commands.Bot):
 
     async def check_and_post_incidents(self):
         """Check for new incidents and post them via webhooks"""
-        conn = sqlite3.connect('bot_data.db')
-        cursor = conn.cursor()
+        # Nothing to do until a webhook is configured
+        if self._active_webhook_count == 0:
+            return
         
-        cursor.execute('SELECT * FROM webhooks WHERE enabled = 1')
-        webhook_configs = cursor.fetchall()
+        webhook_configs = await self.db_fetchall(QUERIES['select_enabled'])
         
+        # Group configs by service so each service is only fetched once
+        configs_by_service: Dict[str, List[tuple]] = {}
         for config in webhook_configs:
-            guild_id, channel_id, webhook_url, service, ping_role_id, enabled, last_incident_id = config
-            
-            data = await self.get_service_data(service)
-            if not data or not data['incidents']:
+            configs_by_service.setdefault(config[2], []).append(config)
+        
+        # A failure in one service must not discard updates for webhooks that were already posted
+        services = list(configs_by_service)
+        results = await asyncio.gather(
+            *(self._process_service(service, configs_by_service[service]) for service in services),
+            return_exceptions=True
+        )
+        pending_updates = []
+        for service, updates in zip(services, results):
+            if isinstance(updates, Exception):
+                logger.error("Error processing %s incidents: %s", service, updates, exc_info=updates)
                 continue
-                
-            latest_incident = data['incidents'][0]
-            latest_incident_id = latest_incident.get('id')
+            pending_updates.extend(updates)
+        
+        # Write all updates in a single transaction
+        if pending_updates:
+            await self.db_executemany(QUERIES['update_last_incident'], pending_updates)
+
+    async def _process_service(self, service: str, configs: List[tuple]) -> List[tuple]:
+        """Fetch one service and post its latest incident to every subscribed webhook"""
+        data = await self.get_service_data(service)
+        if not data or not data['incidents']:
+            return []
             
-            # Check if this is a new incident
-            if latest_incident_id != last_incident_id:
-                embed = self.create_status_embed(service, data)
-                
-                # Prepare webhook payload
-                webhook_data = {"embeds": [embed.to_dict()]}
-                
-                # Add ping if role is set
-                if ping_role_id:
-                    webhook_data["content"] = f"<@&{ping_role_id}> {service.capitalize()} status update!"
-                
-                # Send webhook
-                try:
-                    async with self.session.post(webhook_url, json=webhook_data) as resp:
-                        if resp.status == 204:
-                            # Update last incident ID
-                            cursor.execute(
-                                'UPDATE webhooks SET last_incident_id = ? WHERE guild_id = ? AND service = ?',
-                                (latest_incident_id, guild_id, service)
-                            )
-                            conn.commit()
-                except Exception as e:
-                    print(f"Error sending webhook for {service} in guild {guild_id}: {e}")
-        
-        conn.close()
+        latest_incident = data['incidents'][0]
+        latest_incident_id = latest_incident.get('id')
+        
+        # Only webhooks that haven't seen this incident yet (config[4] is last_incident_id)
+        new_configs = [config for config in configs if config[4] != latest_incident_id]
+        if not new_configs:
+            return []
+        
+        # Build the embed and ping text once and share them across all webhooks for this service
+        embed = self.create_status_embed(service, data)
+        ping_text = f"{service.capitalize()} status update!"
+        
+        results = await asyncio.gather(
+            *(self._post_incident(config, embed, ping_text, latest_incident_id) for config in new_configs),
+            return_exceptions=True
+        )
+        updates = []
+        for update in results:
+            if isinstance(update, Exception):
+                logger.error("Error posting %s incident: %s", service, update, exc_info=update)
+            elif update:
+                updates.append(update)
+        return updates
+
+    async def _post_incident(self, config: tuple, embed: discord.Embed, ping_text: str, latest_incident_id: str) -> Optional[tuple]:
+        """Post to a single webhook, returning the DB update to apply on success"""
+        guild_id, webhook_url, service, ping_role_id, last_incident_id = config
+        
+        # Add ping if role is set
+        content = f"<@&{ping_role_id}> {ping_text}" if ping_role_id else None
+        
+        # Send webhook (discord.py handles serialization and rate limits; bounded so
+        # queued posts don't time out waiting for a connection)
+        try:
+            webhook = discord.Webhook.from_url(webhook_url, session=self.session)
+            async with self.webhook_post_semaphore:
+                await webhook.send(content=content, embed=embed)
+            return (latest_incident_id, guild_id, service)
+        except Exception as e:
+            logger.error("Error sending webhook for %s in guild %s: %s", service, guild_id, e)
+        return None
 
 bot = StatusBot()
 
@@ -305,14 +529,16 @@ async def send_embed(interaction: discord.Interaction, channel: discord.TextChan
         sent_count = 0
         failed_count = 0
         
+        # Build the embed once; sends are sequential so only the footer is updated per send
+        embed = discord.Embed(
+            title=title,
+            description=description,
+            color=embed_color,
+            timestamp=datetime.now(timezone.utc)
+        )
+        
         for i in range(count):
             try:
-                embed = discord.Embed(
-                    title=title,
-                    description=description,
-                    color=embed_color,
-                    timestamp=datetime.now(timezone.utc)
-                )
                 embed.set_footer(text=f"Sent via Status Bot {f'({i+1}/{count})' if count > 1 else ''}")
                 
                 await channel.send(embed=embed)
@@ -372,33 +598,35 @@ async def broadcast(interaction: discord.Interaction, message: str, embed_format
     total_failed = 0
     servers_reached = 0
     
-    for guild in bot.guilds:
-        # Find a suitable channel (general, first text channel, or system channel)
-        target_channel = None
+    # Send to several guilds at once; discord.py handles per-route rate limits
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    
+    async def send_to_guild(guild: discord.Guild):
+        nonlocal total_sent, total_failed, servers_reached
         
-        # Try system channel first
-        if guild.system_channel and guild.system_channel.permissions_for(guild.me).send_messages:
-            target_channel = guild.system_channel
-        else:
-            # Find first channel we can send messages to
-            for channel in guild.text_channels:
-                if channel.permissions_for(guild.me).send_messages:
-                    target_channel = channel
-                    break
+        # Find a suitable channel (system channel or first sendable text channel)
+        target_channel = bot.get_target_channel(guild)
         
-        if target_channel:
-            sent_to_guild = 0
-            failed_to_guild = 0
-            
+        if not target_channel:
+            total_failed += count
+            return
+        
+        sent_to_guild = 0
+        
+        # One embed per guild (guilds send concurrently); only its footer changes per send
+        embed = None
+        if embed_format:
+            embed = discord.Embed(
+                title="📢 Broadcast Message",
+                description=message,
+                color=0x0099ff,
+                timestamp=datetime.now(timezone.utc)
+            )
+        
+        async with semaphore:
             for i in range(count):
                 try:
-                    if embed_format:
-                        embed = discord.Embed(
-                            title="📢 Broadcast Message",
-                            description=message,
-                            color=0x0099ff,
-                            timestamp=datetime.now(timezone.utc)
-                        )
+                    if embed:
                         embed.set_footer(text=f"Status Bot Broadcast {f'({i+1}/{count})' if count > 1 else ''}")
                         await target_channel.send(embed=embed)
                     else:
@@ -414,24 +642,14 @@ async def broadcast(interaction: discord.Interaction, message: str, embed_format
                 except discord.HTTPException as e:
                     if e.status == 429:  # Rate limited
                         await asyncio.sleep(2)  # Wait longer for broadcasts
-                        failed_to_guild += 1
-                        total_failed += 1
-                    else:
-                        failed_to_guild += 1
-                        total_failed += 1
+                    total_failed += 1
                 except Exception:
-                    failed_to_guild += 1
                     total_failed += 1
-            
-            if sent_to_guild > 0:
-                servers_reached += 1
-                
-            # Small delay between servers to avoid overwhelming Discord
-            if delay > 0:
-                await asyncio.sleep(0.5)
-                
-        else:
-            total_failed += count
+        
+        if sent_to_guild > 0:
+            servers_reached += 1
+    
+    await asyncio.gather(*(send_to_guild(guild) for guild in bot.guilds), return_exceptions=True)
     
     result_msg = f"✅ Broadcast complete!\n"
     result_msg += f"📊 **Statistics:**\n"
@@ -488,33 +706,30 @@ async def multi_send(interaction: discord.Interaction, server_ids: str, message:
             continue
         
         # Find suitable channel
-        target_channel = None
-        if guild.system_channel and guild.system_channel.permissions_for(guild.me).send_messages:
-            target_channel = guild.system_channel
-        else:
-            for channel in guild.text_channels:
-                if channel.permissions_for(guild.me).send_messages:
-                    target_channel = channel
-                    break
+        target_channel = bot.get_target_channel(guild)
         
         if not target_channel:
             results[guild_id] = f"❌ No accessible channel in {guild.name}"
             total_failed += count
             continue
         
+        # Build the embed once per guild; sends are sequential so only the footer is updated per send
+        embed = None
+        if embed_format:
+            embed = discord.Embed(
+                title="📨 Multi-Server Message",
+                description=message,
+                color=0x00ff99,
+                timestamp=datetime.now(timezone.utc)
+            )
+        
         # Send messages
         sent_to_guild = 0
         failed_to_guild = 0
         
         for i in range(count):
             try:
-                if embed_format:
-                    embed = discord.Embed(
-                        title="📨 Multi-Server Message",
-                        description=message,
-                        color=0x00ff99,
-                        timestamp=datetime.now(timezone.utc)
-                    )
+                if embed:
                     embed.set_footer(text=f"Sent to {guild.name} {f'({i+1}/{count})' if count > 1 else ''}")
                     await target_channel.send(embed=embed)
                 else:
@@ -566,13 +781,7 @@ async def multi_send(interaction: discord.Interaction, server_ids: str, message:
 @is_owner()
 async def bot_stats(interaction: discord.Interaction):
     # Get webhook count
-    conn = sqlite3.connect('bot_data.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT COUNT(*) FROM webhooks WHERE enabled = 1')
-    active_webhooks = cursor.fetchone()[0]
-    cursor.execute('SELECT COUNT(DISTINCT guild_id) FROM webhooks')
-    guilds_with_webhooks = cursor.fetchone()[0]
-    conn.close()
+    active_webhooks, guilds_with_webhooks = await bot.db_fetchone(QUERIES['webhook_stats'])
     
     embed = discord.Embed(
         title="🤖 Bot Statistics",
@@ -586,7 +795,7 @@ async def bot_stats(interaction: discord.Interaction):
     embed.add_field(name="Latency", value=f"{round(bot.latency * 1000)}ms", inline=True)
     
     # Uptime calculation
-    uptime = datetime.now(timezone.utc) - bot.start_time if hasattr(bot, 'start_time') else timedelta(0)
+    uptime = timedelta(seconds=time.monotonic() - bot.start_monotonic) if hasattr(bot, 'start_monotonic') else timedelta(0)
     days = uptime.days
     hours, remainder = divmod(uptime.seconds, 3600)
     minutes, _ = divmod(remainder, 60)
@@ -636,19 +845,13 @@ async def setup_webhook(interaction: discord.Interaction, channel: discord.TextC
         webhook = await channel.create_webhook(name=f"{service.capitalize()} Status Bot")
         
         # Store in database
-        conn = sqlite3.connect('bot_data.db')
-        cursor = conn.cursor()
-        
         ping_role_id = ping_role.id if ping_role else None
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO webhooks 
-            (guild_id, channel_id, webhook_url, service, ping_role_id, enabled, last_incident_id)
-            VALUES (?, ?, ?, ?, ?, 1, NULL)
-        ''', (interaction.guild.id, channel.id, webhook.url, service, ping_role_id))
-        
-        conn.commit()
-        conn.close()
+        await bot.db_execute(
+            QUERIES['upsert_webhook'],
+            (interaction.guild.id, channel.id, webhook.url, service, ping_role_id)
+        )
+        await bot.refresh_active_webhook_count()
         
         embed = discord.Embed(
             title="✅ Webhook Setup Complete",
@@ -680,30 +883,20 @@ async def remove_webhook(interaction: discord.Interaction, service: str):
         await interaction.response.send_message("❌ You need 'Manage Webhooks' permission to use this command.", ephemeral=True)
         return
     
-    conn = sqlite3.connect('bot_data.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM webhooks WHERE guild_id = ? AND service = ?', (interaction.guild.id, service))
+    cursor = await bot.db_execute(QUERIES['delete_webhook'], (interaction.guild.id, service))
+    await bot.refresh_active_webhook_count()
     
     if cursor.rowcount > 0:
-        conn.commit()
         await interaction.response.send_message(f"✅ Removed auto-posting for {service.capitalize()}")
     else:
         await interaction.response.send_message(f"❌ No webhook found for {service.capitalize()}")
-    
-    conn.close()
 
 @bot.tree.command(name="listwebhooks", description="List all active webhooks in this server")
 async def list_webhooks(interaction: discord.Interaction):
-    conn = sqlite3.connect('bot_data.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT service, channel_id, ping_role_id, enabled FROM webhooks WHERE guild_id = ?', (interaction.guild.id,))
-    webhooks = cursor.fetchall()
+    webhooks = await bot.db_fetchall(QUERIES['list_guild_webhooks'], (interaction.guild.id,))
     
     if not webhooks:
         await interaction.response.send_message("No webhooks configured for this server.")
-        conn.close()
         return
     
     embed = discord.Embed(title="Active Webhooks", color=0x0099ff)
@@ -725,7 +918,6 @@ async def list_webhooks(interaction: discord.Interaction):
             inline=True
         )
     
-    conn.close()
     await interaction.response.send_message(embed=embed)
 
 @bot.tree.command(name="togglewebhook", description="Enable or disable a webhook")
@@ -740,46 +932,96 @@ async def toggle_webhook(interaction: discord.Interaction, service: str):
         await interaction.response.send_message("❌ You need 'Manage Webhooks' permission to use this command.", ephemeral=True)
         return
     
-    conn = sqlite3.connect('bot_data.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT enabled FROM webhooks WHERE guild_id = ? AND service = ?', (interaction.guild.id, service))
-    result = cursor.fetchone()
+    result = await bot.db_fetchone(QUERIES['select_enabled_flag'], (interaction.guild.id, service))
     
     if not result:
         await interaction.response.send_message(f"❌ No webhook found for {service.capitalize()}")
-        conn.close()
         return
     
     new_status = not result[0]
-    cursor.execute('UPDATE webhooks SET enabled = ? WHERE guild_id = ? AND service = ?', (new_status, interaction.guild.id, service))
-    conn.commit()
+    await bot.db_execute(QUERIES['set_enabled'], (new_status, interaction.guild.id, service))
+    await bot.refresh_active_webhook_count()
     
     status_text = "enabled" if new_status else "disabled"
     await interaction.response.send_message(f"✅ {service.capitalize()} webhook has been {status_text}")
-    
-    conn.close()
 
 @bot.event
 async def on_ready():
-    bot.start_time = datetime.now(timezone.utc)  # Track start time for uptime
-    print(f'{bot.user} has connected to Discord!')
-    print(f'Bot is in {len(bot.guilds)} guilds')
-    print(f'Owner ID: {OWNER_ID}')
+    # Track start time for uptime - only on the first ready so reconnects don't reset it
+    if not hasattr(bot, 'start_monotonic'):
+        bot.start_time = datetime.now(timezone.utc)  # Wall-clock start for display
+        bot.start_monotonic = time.monotonic()
+    logger.info('%s has connected to Discord!', bot.user)
+    logger.info('Bot is in %d guilds', len(bot.guilds))
+    logger.info('Owner ID: %s', OWNER_ID)
+
+# Invalidate cached broadcast target channels when channels, roles or guild settings change
+@bot.event
+async def on_guild_channel_create(channel: discord.abc.GuildChannel):
+    bot.invalidate_target_channel(channel.guild.id)
+
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    bot.invalidate_target_channel(channel.guild.id)
+
+@bot.event
+async def on_guild_channel_update(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    bot.invalidate_target_channel(after.guild.id)
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    bot.invalidate_target_channel(after.guild.id)
+
+@bot.event
+async def on_guild_update(before: discord.Guild, after: discord.Guild):
+    bot.invalidate_target_channel(after.id)
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    bot.invalidate_target_channel(guild.id)
+
+async def send_error_reply(interaction: discord.Interaction, msg: str):
+    """Reply to a failed command, following up if the interaction was already acknowledged"""
+    async with bot.error_reply_semaphore:
+        send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+        try:
+            await send(msg, ephemeral=True)
+        except discord.NotFound:
+            logger.warning("Interaction expired before error reply")
+        except discord.HTTPException:
+            logger.exception("Failed to send error reply")
 
 # Error handler for owner-only commands
 @bot.tree.error
 async def on_app_command_error(interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
     if isinstance(error, discord.app_commands.CheckFailure):
-        owner_commands = ['sendmessage', 'sendembed', 'broadcast', 'botstats', 'multisend', 'spamchannel']
-        if interaction.command.name in owner_commands:
-            await interaction.response.send_message("❌ This command is restricted to the bot owner only.", ephemeral=True)
+        if interaction.command is not None and interaction.command.name in OWNER_COMMANDS:
+            msg = OWNER_ONLY_MSG
         else:
-            await interaction.response.send_message("❌ You don't have permission to use this command.", ephemeral=True)
+            msg = NO_PERM_MSG
     else:
-        print(f"Command error: {error}")
-        if not interaction.response.is_done():
-            await interaction.response.send_message("❌ An error occurred while executing the command.", ephemeral=True)
+        logger.error("Command error: %s", error, exc_info=error)
+        msg = GENERIC_ERR_MSG
+    
+    # Reply in the background so a slow REST call doesn't hold up dispatch
+    task = asyncio.create_task(send_error_reply(interaction, msg))
+    bot._error_reply_tasks.add(task)
+    task.add_done_callback(bot._error_reply_tasks.discard)
+
+async def main():
+    async with bot:
+        await bot.start(BOT_TOKEN)
 
 if __name__ == "__main__":
-    bot.run(BOT_TOKEN)
+    # bot.run() normally sets up discord.py's logging; keep that when starting manually
+    discord.utils.setup_logging()
+    try:
+        if uvloop and sys.version_info >= (3, 12):
+            asyncio.run(main(), loop_factory=uvloop.new_event_loop)
+        else:
+            if uvloop:
+                uvloop.install()  # deprecated on 3.12+, where loop_factory is used instead
+            asyncio.run(main())
+    except KeyboardInterrupt:
+        # Exit quietly on Ctrl+C like bot.run() does
+        pass